@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+GitHub Workflow Runs Analytics
+Calcula métricas agregadas de CI (tasa de fallos, percentiles de duración,
+éxito de reintentos, concentración de fallos por runner y regresiones de
+duración de steps) sobre un directorio de runs extraídos con
+scrap_formated_runs.py
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import pickle
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scrap_formated_runs import FAILED_CONCLUSIONS, iter_run_rows
+
+CACHE_DIRNAME = '.analytics_cache'
+CACHE_VERSION = 3
+
+IGNORED_CONCLUSIONS = ['skipped', 'cancelled', 'neutral']
+
+# Columnas de cada tabla (campos de iter_run_rows); los timestamps se
+# convierten a datetime al cargar, 'duration' es su execution_time y 'labels'
+# el conjunto de labels del runner ordenado y unido con comas
+TABLE_COLUMNS = {
+    'runs': ['file', 'run_id', 'workflow', 'event', 'conclusion', 'attempt_count',
+             'created_at', 'run_started_at', 'updated_at'],
+    'attempts': ['file', 'run_id', 'workflow', 'run_attempt', 'conclusion',
+                 'run_started_at', 'updated_at', 'duration'],
+    'jobs': ['file', 'run_id', 'workflow', 'run_attempt', 'job_id', 'job',
+             'conclusion', 'runner_name', 'labels', 'started_at', 'completed_at', 'duration'],
+    'steps': ['file', 'run_id', 'workflow', 'run_attempt', 'job_id', 'job',
+              'step_number', 'step', 'conclusion', 'started_at', 'completed_at', 'duration'],
+}
+TIMESTAMP_COLUMNS = ['created_at', 'run_started_at', 'updated_at', 'started_at', 'completed_at']
+
+
+def load_run_rows(path: str) -> Tuple[Dict[str, List[Tuple]], Optional[str]]:
+    """
+    Lee un run_*.json y lo aplana en filas para cada tabla (sin logs)
+
+    Se ejecuta en procesos separados, por eso devuelve tuplas simples. Un
+    archivo ilegible o truncado no aborta la carga: devuelve filas vacías
+    y el error.
+
+    Args:
+        path: Ruta del archivo del run
+
+    Returns:
+        Tupla (dict con nombre de tabla -> lista de filas, error o None)
+    """
+    rows = {name: [] for name in TABLE_COLUMNS}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            run = json.load(f)
+    except (OSError, ValueError) as e:
+        return rows, str(e)
+
+    file_name = os.path.basename(path)
+    for table, row, _ in iter_run_rows(run):
+        row['file'], row['duration'] = file_name, row.get('execution_time')
+        if table == 'jobs':
+            row['labels'] = ','.join(sorted(row['labels']))
+        rows[table].append(tuple(row[column] for column in TABLE_COLUMNS[table]))
+    return rows, None
+
+
+def _to_frames(rows: Dict[str, List[Tuple]]) -> Dict[str, pd.DataFrame]:
+    """
+    Convierte las filas acumuladas a DataFrames con timestamps y categorías
+    """
+    frames = {}
+    for name, columns in TABLE_COLUMNS.items():
+        df = pd.DataFrame(rows.get(name, []), columns=columns)
+        for column in TIMESTAMP_COLUMNS:
+            if column in df:
+                df[column] = pd.to_datetime(df[column], utc=True, errors='coerce')
+        for column in ('workflow', 'job', 'step', 'conclusion', 'runner_name', 'labels', 'event'):
+            if column in df:
+                df[column] = df[column].astype('category')
+        if 'duration' in df:
+            df['duration'] = df['duration'].astype('float64')
+        frames[name] = df
+    return frames
+
+
+class RunDataset:
+    """
+    Tablas columnares (runs, attempts, jobs, steps) de un directorio de runs
+
+    Las tablas se guardan en CACHE_DIRNAME dentro del directorio y solo se
+    leen los run_*.json nuevos o modificados desde la última carga.
+    """
+
+    def __init__(self, runs_dir: str, workers: Optional[int] = None, use_cache: bool = True):
+        """
+        Args:
+            runs_dir: Directorio con los run_*.json
+            workers: Número de procesos para cargar archivos (None = CPUs)
+            use_cache: Si reutilizar y actualizar la caché en disco
+        """
+        self.runs_dir = runs_dir
+        self.workers = workers
+        self.use_cache = use_cache
+        self.cache_path = os.path.join(runs_dir, CACHE_DIRNAME, 'tables.pkl')
+        self.files = {}
+        self.tables = _to_frames({})
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        with os.scandir(self.runs_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.startswith('run_') and entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    files[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _read_cache(self) -> bool:
+        # Una caché ilegible (truncada, o generada con otra versión de
+        # pandas/numpy) no es un error: se descarta y se recarga todo
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('version') != CACHE_VERSION:
+                return False
+            files, tables = cached['files'], cached['tables']
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Caché inválida en {self.cache_path}, se recargarán todos los runs: {e}")
+            return False
+        self.files = files
+        self.tables = tables
+        return True
+
+    def _write_cache(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': CACHE_VERSION, 'files': self.files, 'tables': self.tables},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_path)
+
+    def load(self) -> 'RunDataset':
+        """
+        Carga las tablas, leyendo en paralelo solo los archivos nuevos o
+        modificados y descartando los que ya no existen
+        """
+        current = self._scan()
+        if self.use_cache:
+            self._read_cache()
+
+        stale = {name for name, sig in self.files.items() if current.get(name) != sig}
+        pending = sorted(name for name, sig in current.items() if self.files.get(name) != sig)
+        if not (stale or pending):
+            print(f"Caché al día: {len(current)} runs")
+            return self
+
+        print(f"Cargando {len(pending)} runs nuevos o modificados ({len(current) - len(pending)} en caché)")
+        rows = {name: [] for name in TABLE_COLUMNS}
+        paths = [os.path.join(self.runs_dir, name) for name in pending]
+        if paths:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = executor.map(load_run_rows, paths, chunksize=16)
+                for file_name, (file_rows, error) in zip(pending, results):
+                    if error:
+                        # Fuera de self.files: se vuelve a intentar en la próxima carga
+                        print(f"Error al leer {file_name}, se omite: {error}")
+                        del current[file_name]
+                        continue
+                    for name, table_rows in file_rows.items():
+                        rows[name].extend(table_rows)
+
+        new_tables = _to_frames(rows)
+        for name, df in self.tables.items():
+            kept = df[~df['file'].isin(stale)]
+            merged = pd.concat([kept, new_tables[name]], ignore_index=True)
+            for column in ('workflow', 'job', 'step', 'conclusion', 'runner_name', 'labels', 'event'):
+                if column in merged:
+                    merged[column] = merged[column].astype('category')
+            self.tables[name] = merged
+
+        self.files = current
+        if self.use_cache:
+            self._write_cache()
+        return self
+
+
+def failure_rate_by_window(runs: pd.DataFrame, window: str) -> pd.DataFrame:
+    """
+    Tasa de fallos de los runs por workflow y ventana de tiempo
+
+    Args:
+        runs: Tabla de runs
+        window: Frecuencia de pandas (ej: '1D', '7D', '1W')
+    """
+    considered = runs[~runs['conclusion'].isin(IGNORED_CONCLUSIONS) & runs['conclusion'].notna()]
+    considered = considered.assign(failed=considered['conclusion'].isin(FAILED_CONCLUSIONS))
+    grouped = considered.groupby(['workflow', pd.Grouper(key='run_started_at', freq=window)],
+                                 observed=True)['failed']
+    result = grouped.agg(runs='size', failures='sum').reset_index()
+    result['failure_rate'] = result['failures'] / result['runs']
+    return result
+
+
+def duration_percentiles(df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    p50/p95 de duración (segundos) agrupando por las columnas dadas
+    """
+    timed = df[df['duration'].notna() & ~df['conclusion'].isin(IGNORED_CONCLUSIONS)]
+    if timed.empty:
+        return pd.DataFrame(columns=keys + ['p50', 'p95', 'count'])
+    grouped = timed.groupby(keys, observed=True)['duration']
+    result = grouped.quantile([0.5, 0.95]).unstack().rename(columns={0.5: 'p50', 0.95: 'p95'})
+    result['count'] = grouped.size()
+    return result.reset_index()
+
+
+def retry_success_rate(attempts: pd.DataFrame, jobs: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Éxito de los reintentos: runs cuyo primer attempt falló y que terminaron
+    en éxito en un attempt posterior, y jobs que fallaron y luego pasaron en
+    el mismo run (flaky)
+    """
+    ordered = attempts.sort_values(['run_id', 'run_attempt'])
+    # drop_duplicates y no first()/last(): esos saltan las conclusiones nulas
+    # y tomarían otro attempt cuando el primero o el último no terminó
+    first = ordered.drop_duplicates('run_id', keep='first').set_index('run_id')
+    last = ordered.drop_duplicates('run_id', keep='last').set_index('run_id')
+    summary = pd.DataFrame({
+        'workflow': first['workflow'],
+        'first_failed': first['conclusion'].isin(FAILED_CONCLUSIONS),
+        'final_success': last['conclusion'] == 'success',
+        'attempts': ordered.groupby('run_id').size(),
+    })
+    retried = summary[summary['first_failed'] & (summary['attempts'] > 1)]
+    runs_result = retried.groupby('workflow', observed=True).agg(
+        retried_runs=('final_success', 'size'), recovered=('final_success', 'sum')).reset_index()
+    runs_result['retry_success_rate'] = runs_result['recovered'] / runs_result['retried_runs']
+
+    job_outcomes = jobs.assign(
+        failed=jobs['conclusion'].isin(FAILED_CONCLUSIONS),
+        succeeded=jobs['conclusion'] == 'success'
+    ).groupby(['workflow', 'job', 'run_id'], observed=True).agg(
+        failed=('failed', 'any'), succeeded=('succeeded', 'any'), attempts=('run_attempt', 'nunique'))
+    multi = job_outcomes[job_outcomes['attempts'] > 1]
+    flaky = multi.assign(flaky=multi['failed'] & multi['succeeded']).groupby(
+        ['workflow', 'job'], observed=True).agg(retried_runs=('flaky', 'size'), flaky_runs=('flaky', 'sum'))
+    flaky['flakiness'] = flaky['flaky_runs'] / flaky['retried_runs']
+    return {'runs': runs_result, 'jobs': flaky.reset_index()}
+
+
+def runner_failure_concentration(jobs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fallos de jobs por tipo de runner (conjunto de labels) y qué fracción del
+    total de fallos concentra cada uno
+
+    runner_name solo distingue runners self-hosted; en los hospedados por
+    GitHub cada job recibe una máquina distinta y se agrupan solo por labels.
+    """
+    labels = jobs['labels'].astype('object').fillna('')
+    self_hosted = (',' + labels + ',').str.contains(',self-hosted,', regex=False)
+    runner_name = jobs['runner_name'].astype('object').where(self_hosted).fillna('')
+    has_runner = (labels != '') | (runner_name != '')
+    considered = jobs.assign(labels=labels, runner_name=runner_name)
+    considered = considered[~considered['conclusion'].isin(IGNORED_CONCLUSIONS) & has_runner]
+    considered = considered.assign(failed=considered['conclusion'].isin(FAILED_CONCLUSIONS))
+    result = considered.groupby(['labels', 'runner_name'])['failed'].agg(
+        jobs='size', failures='sum').reset_index()
+    total_failures = result['failures'].sum()
+    result['failure_rate'] = result['failures'] / result['jobs']
+    result['failure_share'] = result['failures'] / total_failures if total_failures else 0.0
+    return result.sort_values('failures', ascending=False, ignore_index=True)
+
+
+def step_duration_regressions(steps: pd.DataFrame, recent: str, threshold: float,
+                              min_samples: int = 3) -> pd.DataFrame:
+    """
+    Steps cuya mediana de duración en el periodo reciente supera a la del
+    periodo anterior por un factor mayor a threshold
+
+    Args:
+        steps: Tabla de steps
+        recent: Largo del periodo reciente (Timedelta de pandas, ej: '7D'),
+                contado hacia atrás desde el step más reciente del dataset
+        threshold: Factor de aumento de la mediana para considerar regresión
+        min_samples: Muestras mínimas en cada periodo
+    """
+    timed = steps[steps['duration'].notna() & (steps['conclusion'] == 'success')]
+    keys = ['workflow', 'job', 'step']
+    if timed.empty:
+        return pd.DataFrame(columns=keys + ['baseline_p50', 'baseline_size',
+                                            'recent_p50', 'recent_size', 'ratio'])
+
+    cutoff = timed['started_at'].max() - pd.Timedelta(recent)
+    is_recent = (timed['started_at'] > cutoff).to_numpy()
+    stats = []
+    for label, mask in (('baseline', ~is_recent), ('recent', is_recent)):
+        grouped = timed[mask].groupby(keys, observed=True)['duration']
+        stats.append(grouped.agg(['median', 'size']).add_prefix(f'{label}_'))
+
+    merged = stats[0].join(stats[1], how='inner')
+    merged = merged[(merged['baseline_size'] >= min_samples) & (merged['recent_size'] >= min_samples)]
+    ratio = merged['recent_median'] / merged['baseline_median'].replace(0, np.nan)
+    result = merged.assign(ratio=ratio)[ratio > threshold].rename(
+        columns={'baseline_median': 'baseline_p50', 'recent_median': 'recent_p50'})
+    return result.reset_index().sort_values('ratio', ascending=False, ignore_index=True)
+
+
+def compute_analytics(dataset: RunDataset, window: str, recent: str, threshold: float) -> Dict[str, pd.DataFrame]:
+    """
+    Calcula todas las métricas sobre las tablas del dataset
+    """
+    tables = dataset.tables
+    retries = retry_success_rate(tables['attempts'], tables['jobs'])
+    return {
+        'failure_rate': failure_rate_by_window(tables['runs'], window),
+        'workflow_durations': duration_percentiles(tables['attempts'], ['workflow']),
+        'job_durations': duration_percentiles(tables['jobs'], ['workflow', 'job']),
+        'step_durations': duration_percentiles(tables['steps'], ['workflow', 'job', 'step']),
+        'retry_success': retries['runs'],
+        'flaky_jobs': retries['jobs'],
+        'runner_failures': runner_failure_concentration(tables['jobs']),
+        'step_regressions': step_duration_regressions(tables['steps'], recent, threshold),
+    }
+
+
+def load_or_compute_analytics(dataset: RunDataset, window: str, recent: str,
+                              threshold: float) -> Dict[str, pd.DataFrame]:
+    """
+    Devuelve las métricas desde la caché si fueron calculadas con los mismos
+    archivos (firma mtime/tamaño de cada run) y parámetros; si no, las
+    recalcula y las guarda
+    """
+    params = (window, recent, threshold)
+    results_path = os.path.join(dataset.runs_dir, CACHE_DIRNAME, 'results.pkl')
+
+    if dataset.use_cache:
+        try:
+            with open(results_path, 'rb') as f:
+                cached = pickle.load(f)
+            if (cached.get('version') == CACHE_VERSION and cached.get('params') == params
+                    and cached.get('files') == dataset.files):
+                return cached['results']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Caché de métricas inválida en {results_path}, se recalculan: {e}")
+
+    results = compute_analytics(dataset, window, recent, threshold)
+    if dataset.use_cache:
+        os.makedirs(os.path.dirname(results_path), exist_ok=True)
+        tmp_path = results_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': CACHE_VERSION, 'params': params, 'files': dataset.files,
+                         'results': results}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, results_path)
+    return results
+
+
+def print_results(results: Dict[str, pd.DataFrame], limit: int):
+    titles = {
+        'failure_rate': 'Tasa de fallos por ventana',
+        'workflow_durations': 'Duración de workflows (s)',
+        'job_durations': 'Duración de jobs (s)',
+        'step_durations': 'Duración de steps (s)',
+        'retry_success': 'Éxito de reintentos por workflow',
+        'flaky_jobs': 'Jobs inestables (fallan y pasan en el mismo run)',
+        'runner_failures': 'Concentración de fallos por runner',
+        'step_regressions': 'Steps con regresión de duración',
+    }
+    with pd.option_context('display.width', 200, 'display.max_columns', 20,
+                           'display.max_colwidth', 60):
+        for name, df in results.items():
+            print(f"\n== {titles.get(name, name)} ({len(df)} filas) ==")
+            print(df.head(limit).to_string(index=False) if len(df) else '(sin datos)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Métricas de CI sobre un directorio de runs extraídos')
+    parser.add_argument('runs_dir', help='Directorio con los run_*.json')
+    parser.add_argument('--window', default='1D',
+                       help='Ventana de tiempo para la tasa de fallos (por defecto 1D)')
+    parser.add_argument('--recent', default='7D',
+                       help='Periodo reciente para detectar regresiones de duración (por defecto 7D)')
+    parser.add_argument('--regression-threshold', type=float, default=1.5,
+                       help='Factor de aumento de la mediana para marcar una regresión (por defecto 1.5)')
+    parser.add_argument('--workers', type=int, help='Procesos para cargar los runs')
+    parser.add_argument('--no-cache', action='store_true',
+                       help=f'No leer ni escribir la caché en {CACHE_DIRNAME}/')
+    parser.add_argument('--limit', type=int, default=20, help='Filas a mostrar por tabla')
+    parser.add_argument('--output', help='Guardar las métricas en un archivo JSON')
+
+    args = parser.parse_args()
+
+    dataset = RunDataset(args.runs_dir, workers=args.workers, use_cache=not args.no_cache).load()
+    results = load_or_compute_analytics(dataset, args.window, args.recent, args.regression_threshold)
+    print_results(results, args.limit)
+
+    if args.output:
+        payload = {name: json.loads(df.to_json(orient='records', date_format='iso'))
+                   for name, df in results.items()}
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+        print(f"\nMétricas guardadas en: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -9,14 +9,862 @@ import requests
 import json
 import os
 import sys
+import mmap
+import shutil
 import zipfile
 import tempfile
 import re
 import yaml
+from array import array
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import argparse
 
+# Secuencias ANSI de color y marcadores ##[group], ##[section]… de los logs de Actions
+ANSI_ESCAPE_RE = re.compile(r'\x1b\[[0-9;]*[mK]')
+LOG_MARKER_RE = re.compile(r'##\[[^\]]+\]')
+
+# Conclusiones de job/attempt que cuentan como fallo y como éxito
+FAILED_CONCLUSIONS = ('failure', 'timed_out', 'startup_failure')
+PASSED_CONCLUSIONS = ('success', 'skipped', 'neutral')
+
+
+def clean_log_text(text: str) -> str:
+    """
+    Elimina colores ANSI y marcadores de agrupación de un fragmento de log
+    """
+    return LOG_MARKER_RE.sub('', ANSI_ESCAPE_RE.sub('', text))
+
+
+class LogSlice:
+    """
+    Rango de bytes [start, end) dentro de un archivo de log en disco.
+    El texto solo se lee y decodifica al serializar (ver RunsJSONEncoder).
+    """
+    __slots__ = ('path', 'start', 'end')
+
+    def __init__(self, path: str, start: int, end: int):
+        self.path = path
+        self.start = start
+        self.end = end
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return f"LogSlice({self.path!r}, {self.start}, {self.end})"
+
+    def text(self) -> str:
+        """
+        Lee el rango desde disco y lo devuelve decodificado y limpio
+        """
+        if self.end <= self.start:
+            return ''
+        with open(self.path, 'rb') as f:
+            f.seek(self.start)
+            raw = f.read(self.end - self.start)
+        return clean_log_text(raw.decode('utf-8', errors='ignore'))
+
+
+class LogIndex:
+    """
+    Índice de líneas de un archivo de log mapeado en memoria.
+    Solo se guardan los offsets (en bytes) donde empieza cada línea, en un
+    array compacto; el contenido nunca se copia completo a memoria.
+    """
+
+    def __init__(self, path: str):
+        """
+        Construye el índice recorriendo el archivo mapeado en memoria
+
+        Args:
+            path: Ruta del archivo de log
+        """
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.offsets = array('q', [0])
+
+        if self.size:
+            with open(path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = mm.find(b'\n')
+                while pos != -1:
+                    self.offsets.append(pos + 1)
+                    pos = mm.find(b'\n', pos + 1)
+
+    def __len__(self) -> int:
+        """
+        Número de líneas (equivalente a len(contenido.split('\n')))
+        """
+        return len(self.offsets)
+
+    def byte_range(self, start_line: int, stop_line: int) -> Tuple[int, int]:
+        """
+        Rango de bytes que ocupan las líneas [start_line, stop_line), sin el
+        salto de línea final
+        """
+        start = self.offsets[start_line]
+        if stop_line <= start_line:
+            return start, start
+        if stop_line < len(self.offsets):
+            return start, self.offsets[stop_line] - 1
+        return start, self.size
+
+    def slice(self, start_line: int, stop_line: int) -> LogSlice:
+        """
+        LogSlice de las líneas [start_line, stop_line)
+        """
+        start, end = self.byte_range(start_line, stop_line)
+        return LogSlice(self.path, start, end)
+
+    def iter_lines(self, start_line: int = 0) -> Iterator[Tuple[int, str]]:
+        """
+        Recorre las líneas desde start_line, decodificando y limpiando una
+        línea a la vez
+
+        Yields:
+            Tuplas (número de línea, texto limpio)
+        """
+        if not self.size or start_line >= len(self.offsets):
+            return
+        with open(self.path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for i in range(start_line, len(self.offsets)):
+                start, end = self.byte_range(i, i + 1)
+                yield i, clean_log_text(mm[start:end].decode('utf-8', errors='ignore'))
+
+
+class RunsJSONEncoder(json.JSONEncoder):
+    """
+    Encoder JSON que materializa los LogSlice como texto al serializar
+    """
+
+    def default(self, o):
+        if isinstance(o, LogSlice):
+            return o.text()
+        return super().default(o)
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """
+    Convierte un timestamp ISO 8601 de la API (ej: '2025-07-22T15:23:12Z') a datetime
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def seconds_between(start: Optional[str], end: Optional[str]) -> Optional[int]:
+    """
+    Segundos transcurridos entre dos timestamps (None si falta alguno)
+    """
+    start_dt, end_dt = parse_timestamp(start), parse_timestamp(end)
+    if start_dt is None or end_dt is None:
+        return None
+    return max(int((end_dt - start_dt).total_seconds()), 0)
+
+
+def iter_run_attempts(run: Dict) -> List[Dict]:
+    """
+    Devuelve los attempts de un run en el formato de 'run_attempts'
+    
+    Los runs del dataset ya traen 'run_attempts'; los generados por
+    process_run_data solo traen 'jobs', que se agrupan por su run_attempt.
+    De los attempts anteriores al último la API no entrega estado ni
+    conclusión, así que se derivan de sus jobs y quedan en None cuando no
+    se pueden determinar.
+    
+    Args:
+        run: Diccionario del run
+        
+    Returns:
+        Lista de attempts, cada uno con sus jobs
+    """
+    if 'run_attempts' in run:
+        return run['run_attempts'] or []
+    
+    jobs_by_attempt = defaultdict(list)
+    for job in run.get('jobs') or []:
+        jobs_by_attempt[job.get('run_attempt') or run.get('run_attempt') or 1].append(job)
+    if not jobs_by_attempt:
+        jobs_by_attempt[run.get('run_attempt') or 1] = []
+    
+    attempts = []
+    for attempt_number in sorted(jobs_by_attempt):
+        jobs = jobs_by_attempt[attempt_number]
+        if attempt_number == run.get('run_attempt'):
+            attempt = {
+                'run_attempt': attempt_number,
+                'status': run.get('status'),
+                'conclusion': run.get('conclusion'),
+                'updated_at': run.get('updated_at'),
+                'run_started_at': run.get('run_started_at'),
+                'created_at': run.get('created_at'),
+            }
+        else:
+            # Attempt anterior: solo se conoce lo que dicen sus jobs
+            started = [j['started_at'] for j in jobs if j.get('started_at')]
+            completed = [j['completed_at'] for j in jobs if j.get('completed_at')]
+            conclusions = [j.get('conclusion') for j in jobs]
+            if any(c in FAILED_CONCLUSIONS for c in conclusions):
+                conclusion = 'failure'
+            elif 'cancelled' in conclusions:
+                conclusion = 'cancelled'
+            elif conclusions and all(c in PASSED_CONCLUSIONS for c in conclusions):
+                conclusion = 'success'
+            else:
+                conclusion = None
+            all_completed = bool(jobs) and all(j.get('status') == 'completed' for j in jobs)
+            attempt = {
+                'run_attempt': attempt_number,
+                'status': 'completed' if all_completed else None,
+                'conclusion': conclusion,
+                'updated_at': max(completed) if completed else None,
+                'run_started_at': min(started) if started else None,
+                'created_at': min(started) if started else None,
+            }
+        attempt['jobs'] = jobs
+        attempts.append(attempt)
+    return attempts
+
+
+def iter_run_rows(run: Dict) -> Iterator[Tuple[str, Dict, Dict]]:
+    """
+    Aplana un run en filas para las tablas 'runs', 'attempts', 'jobs' y
+    'steps'. Es la única definición de los campos y tiempos de ejecución
+    de cada nivel; la usan RunManifest, ColumnarRunSink y analyze_runs.py
+    
+    Las filas salen en orden jerárquico (el run, luego cada attempt seguido
+    de sus jobs, y cada job seguido de sus steps). Los timestamps quedan
+    como strings ISO 8601 y execution_time en segundos (None si falta
+    algún timestamp; el del run suma los attempts conocidos).
+    
+    Args:
+        run: Diccionario del run
+        
+    Yields:
+        Tuplas (tabla, fila, diccionario original del nivel)
+    """
+    run_id, workflow = run.get('id'), run.get('name')
+    attempts = iter_run_attempts(run)
+    attempt_times = [seconds_between(a.get('run_started_at'), a.get('updated_at'))
+                     for a in attempts]
+    
+    yield 'runs', {
+        'run_id': run_id,
+        'workflow': workflow,
+        'workflow_id': run.get('workflow_id'),
+        'run_number': run.get('run_number'),
+        'display_title': run.get('display_title'),
+        'event': run.get('event'),
+        'status': run.get('status'),
+        'conclusion': run.get('conclusion'),
+        'head_sha': (run.get('head_commit') or {}).get('id'),
+        'actor': (run.get('actor') or {}).get('login'),
+        'html_url': run.get('html_url'),
+        'attempt_count': len(attempts),
+        'created_at': run.get('created_at'),
+        'run_started_at': run.get('run_started_at'),
+        'updated_at': run.get('updated_at'),
+        'execution_time': sum(t for t in attempt_times if t is not None)
+    }, run
+    
+    for attempt, attempt_time in zip(attempts, attempt_times):
+        attempt_key = {'run_id': run_id, 'workflow': workflow,
+                       'run_attempt': attempt.get('run_attempt')}
+        yield 'attempts', {
+            **attempt_key,
+            'status': attempt.get('status'),
+            'conclusion': attempt.get('conclusion'),
+            'run_started_at': attempt.get('run_started_at'),
+            'updated_at': attempt.get('updated_at'),
+            'execution_time': attempt_time
+        }, attempt
+        
+        for job in attempt.get('jobs') or []:
+            job_key = {**attempt_key, 'job_id': job.get('id'), 'job': job.get('name')}
+            yield 'jobs', {
+                **job_key,
+                'status': job.get('status'),
+                'conclusion': job.get('conclusion'),
+                'runner_name': job.get('runner_name'),
+                'labels': job.get('labels') or [],
+                'created_at': job.get('created_at'),
+                'started_at': job.get('started_at'),
+                'completed_at': job.get('completed_at'),
+                'execution_time': seconds_between(job.get('started_at'), job.get('completed_at'))
+            }, job
+            
+            for step in job.get('steps') or []:
+                yield 'steps', {
+                    **job_key,
+                    'step_number': step.get('number'),
+                    'step': step.get('name'),
+                    'status': step.get('status'),
+                    'conclusion': step.get('conclusion'),
+                    'started_at': step.get('started_at'),
+                    'completed_at': step.get('completed_at'),
+                    'execution_time': seconds_between(step.get('started_at'), step.get('completed_at'))
+                }, step
+
+
+class RunManifest:
+    """
+    Manifest compacto de un dataset de runs (MANIFEST_FILENAME en el directorio
+    de salida). Guarda solo metadatos y tiempos de ejecución precalculados de
+    runs, attempts, jobs y steps, más conteos de conclusiones y agrupaciones por
+    workflow, para que el visualizador pueda arrancar sin leer los run_*.json.
+    
+    Los logs se referencian con una ruta relativa al directorio del dataset.
+    Si el log está en LOGS_DIRNAME, 'offset' y 'length' son bytes dentro del
+    log crudo (con colores ANSI y marcadores ##[...] sin limpiar). Si el texto
+    viene embebido en el run_*.json, la referencia lleva 'embedded': true,
+    'length' en bytes UTF-8 y no tiene offset.
+    """
+    MANIFEST_FILENAME = 'runs_manifest.json'
+    LOGS_DIRNAME = 'logs'
+    VERSION = 2
+    LOG_REFERENCE_DOC = {
+        'unit': 'bytes',
+        'offset': 'rango [offset, offset + length) dentro del log crudo en logs/, '
+                  'sin limpiar colores ANSI ni marcadores ##[...]',
+        'embedded': 'log embebido en el run_*.json: no hay offset para hacer seek, '
+                    'length son los bytes UTF-8 del texto'
+    }
+
+    def __init__(self, output_dir: str, load_existing: bool = True):
+        """
+        Carga el manifest existente del directorio; si no hay, lo arma a
+        partir de los run_*.json que ya estén en el directorio
+        
+        Args:
+            output_dir: Directorio del dataset
+            load_existing: Si cargar el manifest o los runs ya guardados
+        """
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, self.MANIFEST_FILENAME)
+        self.repository = None
+        self.runs = {}
+        self.relocated_logs = {}
+        
+        if not load_existing:
+            return
+        if not os.path.exists(self.path):
+            # Directorio sin manifest: se arma con los runs ya guardados
+            if os.path.isdir(output_dir):
+                self._add_run_files()
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.repository = data.get('repository')
+                self.runs = data.get('runs', {})
+            else:
+                # Formato anterior: se reconstruye desde los run_*.json
+                print(f"Manifest con versión {data.get('version')} en {self.path}, se regenerará")
+                self._add_run_files()
+        except (OSError, ValueError) as e:
+            print(f"Manifest ilegible en {self.path}, se regenerará: {e}")
+            self._add_run_files()
+
+    def _add_run_files(self):
+        """
+        Agrega al manifest todos los run_*.json del directorio
+        """
+        for file_name in sorted(os.listdir(self.output_dir)):
+            if not (file_name.startswith('run_') and file_name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.output_dir, file_name), 'r', encoding='utf-8') as f:
+                    self.add_run(json.load(f), file_name)
+            except (OSError, ValueError) as e:
+                print(f"Error al leer {file_name}: {e}")
+
+    @classmethod
+    def rebuild(cls, output_dir: str) -> 'RunManifest':
+        """
+        Regenera el manifest desde cero leyendo los run_*.json del directorio
+        
+        Args:
+            output_dir: Directorio del dataset
+            
+        Returns:
+            Manifest actualizado (ya guardado en disco)
+        """
+        manifest = cls(output_dir, load_existing=False)
+        manifest._add_run_files()
+        manifest.save()
+        return manifest
+
+    def relocate_logs(self, run: Dict):
+        """
+        Mueve los logs crudos que referencian los LogSlice del run al
+        directorio LOGS_DIRNAME del dataset y actualiza los LogSlice, para que
+        el dataset sea autocontenido y las referencias sigan valiendo si se
+        mueve de lugar. Cada step con LogSlice recibe además 'log_ref'
+        (archivo relativo al dataset, offset y length en bytes del log crudo),
+        que se guarda en el run_*.json y permite regenerar el manifest sin
+        perder la referencia
+        
+        Args:
+            run: Diccionario del run (se modifica en el lugar)
+        """
+        logs_dir = os.path.join(self.output_dir, self.LOGS_DIRNAME)
+        for attempt in iter_run_attempts(run):
+            for job in attempt.get('jobs') or []:
+                for step in job.get('steps') or []:
+                    log_content = step.get('log_content')
+                    if not isinstance(log_content, LogSlice):
+                        continue
+                    source = os.path.abspath(log_content.path)
+                    if source not in self.relocated_logs:
+                        target = os.path.join(logs_dir, os.path.basename(source))
+                        if os.path.abspath(target) != source:
+                            os.makedirs(logs_dir, exist_ok=True)
+                            shutil.move(source, target)
+                        self.relocated_logs[source] = target
+                    log_content.path = self.relocated_logs[source]
+                    step['log_ref'] = self._slice_reference(log_content)
+
+    def _slice_reference(self, log_slice: LogSlice) -> Dict:
+        return {
+            'file': os.path.relpath(log_slice.path, self.output_dir),
+            'offset': log_slice.start,
+            'length': len(log_slice)
+        }
+
+    def _log_reference(self, step: Dict, run_file: str) -> Optional[Dict]:
+        """
+        Referencia al log de un step (ver LOG_REFERENCE_DOC): el 'log_ref'
+        guardado en el run, el rango de bytes del log crudo si es un LogSlice,
+        o el run_*.json que lo contiene si el texto solo viene embebido
+        """
+        log_ref = step.get('log_ref')
+        if log_ref and os.path.exists(os.path.join(self.output_dir, log_ref.get('file', ''))):
+            return dict(log_ref)
+        log_content = step.get('log_content')
+        if isinstance(log_content, LogSlice):
+            return self._slice_reference(log_content)
+        if log_content:
+            return {
+                'file': run_file,
+                'embedded': True,
+                'length': len(log_content.encode('utf-8'))
+            }
+        return None
+
+    @staticmethod
+    def _entry(row: Dict, renames: Dict[str, str], drop=()) -> Dict:
+        """
+        Convierte una fila de iter_run_rows en entrada del manifest: quita
+        las claves de los niveles superiores y renombra las del propio nivel
+        """
+        return {renames.get(key, key): value for key, value in row.items() if key not in drop}
+
+    def add_run(self, run: Dict, run_file: str = None):
+        """
+        Agrega (o reemplaza) la entrada de un run en el manifest
+        
+        Args:
+            run: Diccionario del run, tal como se guarda en run_<id>.json
+            run_file: Nombre del archivo del run dentro del directorio
+        """
+        run_file = run_file or f"run_{run['id']}.json"
+        if not self.repository:
+            self.repository = (run.get('repository') or {}).get('full_name')
+        
+        entry, attempt, job = None, None, None
+        attempt_keys = ('run_id', 'workflow')
+        job_keys = attempt_keys + ('run_attempt',)
+        step_keys = job_keys + ('job_id', 'job')
+        for table, row, source in iter_run_rows(run):
+            if table == 'runs':
+                entry = self._entry(row, {'run_id': 'id', 'workflow': 'name'}, drop=('attempt_count',))
+                entry['file'] = run_file
+                entry['attempts'] = []
+            elif table == 'attempts':
+                attempt = self._entry(row, {}, drop=attempt_keys)
+                attempt['execution_time'] = attempt['execution_time'] or 0
+                attempt['jobs'] = []
+                entry['attempts'].append(attempt)
+            elif table == 'jobs':
+                job = self._entry(row, {'job_id': 'id', 'job': 'name'}, drop=job_keys)
+                job['steps'] = []
+                attempt['jobs'].append(job)
+            else:
+                step = self._entry(row, {'step_number': 'number', 'step': 'name'}, drop=step_keys)
+                step['log'] = self._log_reference(source, run_file)
+                job['steps'].append(step)
+        
+        for attempt in entry['attempts']:
+            attempt['job_conclusions'] = self._count_conclusions(attempt['jobs'])
+        entry['most_recent_started_at'] = max((a['run_started_at'] for a in entry['attempts']
+                                               if a['run_started_at']), default=None)
+        self.runs[str(run['id'])] = entry
+
+    @staticmethod
+    def _count_conclusions(entries) -> Dict[str, int]:
+        counts = defaultdict(int)
+        for entry in entries:
+            counts[entry.get('conclusion') or 'none'] += 1
+        return dict(counts)
+
+    def _workflow_groups(self) -> Dict[str, Dict]:
+        """
+        Agrupa los runs por workflow, ordenados por fecha de inicio
+        """
+        groups = {}
+        for entry in sorted(self.runs.values(), key=lambda r: r.get('run_started_at') or ''):
+            group = groups.setdefault(entry.get('name') or 'unknown', {
+                'workflow_id': entry.get('workflow_id'),
+                'runs': [],
+                'conclusions': defaultdict(int),
+                'execution_time': 0
+            })
+            group['runs'].append(entry['id'])
+            group['conclusions'][entry.get('conclusion') or 'none'] += 1
+            group['execution_time'] += entry['execution_time']
+        return groups
+
+    def save(self):
+        """
+        Escribe el manifest de forma atómica (archivo temporal + rename)
+        """
+        jobs = [job for run in self.runs.values() for attempt in run['attempts']
+                for job in attempt['jobs']]
+        data = {
+            'version': self.VERSION,
+            'repository': self.repository,
+            'log_reference': self.LOG_REFERENCE_DOC,
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'conclusions': {
+                'runs': self._count_conclusions(self.runs.values()),
+                'jobs': self._count_conclusions(jobs)
+            },
+            'workflows': self._workflow_groups(),
+            'runs': self.runs
+        }
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+
+class ColumnarRunSink:
+    """
+    Exporta runs a tablas columnares (Parquet o Arrow IPC) para runs,
+    attempts, jobs y steps, particionadas estilo Hive por repo y fecha:
+
+        <output_dir>/<tabla>/repo=<owner_repo>/date=<YYYY-MM-DD>/part-*.parquet
+
+    Los runs se acumulan y se escriben por lotes a medida que el extractor
+    los produce. Los logs quedan fuera salvo que se pida include_logs, en cuyo
+    caso van en la columna 'log_content' de steps.
+    
+    El export es idempotente por run: INDEX_FILENAME guarda, para cada run
+    exportado, su updated_at y los archivos que contienen sus filas. Solo se
+    exportan runs terminados (status 'completed'); un run ya exportado con el
+    mismo updated_at se omite, y si cambió (ej: un re-run) se quitan sus filas
+    de esos archivos antes de escribirlo de nuevo.
+    """
+    TABLES = ('runs', 'attempts', 'jobs', 'steps')
+    TIMESTAMP_COLUMNS = ('created_at', 'run_started_at', 'updated_at', 'started_at', 'completed_at')
+    INDEX_FILENAME = '_exported_runs.json'
+
+    def __init__(self, output_dir: str, fmt: str = 'parquet', batch_size: int = 100,
+                 include_logs: bool = False):
+        """
+        Args:
+            output_dir: Directorio raíz del export
+            fmt: 'parquet' o 'arrow' (Arrow IPC)
+            batch_size: Número de runs por lote escrito
+            include_logs: Si agregar el texto de los logs a la tabla de steps
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("El export columnar requiere pyarrow (pip install pyarrow)")
+        if fmt not in ('parquet', 'arrow'):
+            raise ValueError(f"Formato columnar no soportado: {fmt}")
+
+        self.pa = pa
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.include_logs = include_logs
+        self.extension = 'parquet' if fmt == 'parquet' else 'arrow'
+        self.session = f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{os.getpid()}"
+        self.batch_number = 0
+        self.rows = {table: defaultdict(list) for table in self.TABLES}
+        self.schemas = self._build_schemas()
+        # run_id -> {'updated_at', 'files'} de lo ya escrito y del lote actual
+        self.index_path = os.path.join(output_dir, self.INDEX_FILENAME)
+        self.index = self._load_index()
+        self.pending = {}
+        self.superseded = set()
+        self.skipped_runs = 0
+
+    def _build_schemas(self) -> Dict:
+        pa = self.pa
+        ts = pa.timestamp('s', tz='UTC')
+        run_keys = [('run_id', pa.int64()), ('workflow', pa.string())]
+        attempt_keys = run_keys + [('run_attempt', pa.int32())]
+        job_keys = attempt_keys + [('job_id', pa.int64()), ('job', pa.string())]
+        steps = job_keys + [
+            ('step_number', pa.int32()), ('step', pa.string()), ('status', pa.string()),
+            ('conclusion', pa.string()), ('started_at', ts), ('completed_at', ts),
+            ('execution_time', pa.int64())]
+        if self.include_logs:
+            steps.append(('log_content', pa.large_string()))
+        return {
+            'runs': pa.schema(run_keys + [
+                ('workflow_id', pa.int64()), ('run_number', pa.int64()), ('display_title', pa.string()),
+                ('event', pa.string()), ('status', pa.string()), ('conclusion', pa.string()),
+                ('head_sha', pa.string()), ('actor', pa.string()), ('html_url', pa.string()),
+                ('attempt_count', pa.int32()),
+                ('created_at', ts), ('run_started_at', ts), ('updated_at', ts),
+                ('execution_time', pa.int64())]),
+            'attempts': pa.schema(attempt_keys + [
+                ('status', pa.string()), ('conclusion', pa.string()),
+                ('run_started_at', ts), ('updated_at', ts), ('execution_time', pa.int64())]),
+            'jobs': pa.schema(job_keys + [
+                ('status', pa.string()), ('conclusion', pa.string()), ('runner_name', pa.string()),
+                ('labels', pa.list_(pa.string())), ('created_at', ts), ('started_at', ts),
+                ('completed_at', ts), ('execution_time', pa.int64())]),
+            'steps': pa.schema(steps),
+        }
+
+    @staticmethod
+    def _partition(run: Dict) -> Tuple[str, str]:
+        """
+        Valores de partición (repo, fecha) de un run
+        """
+        full_name = (run.get('repository') or {}).get('full_name') or 'unknown_repo'
+        started = parse_timestamp(run.get('run_started_at') or run.get('created_at'))
+        return full_name.lower().replace('/', '_'), started.strftime('%Y-%m-%d') if started else 'unknown'
+
+    def _step_log_text(self, log_content) -> Optional[str]:
+        """
+        Texto del log de un step; None si el archivo del LogSlice no se puede leer
+        """
+        if not isinstance(log_content, LogSlice):
+            return log_content
+        try:
+            return log_content.text()
+        except OSError as e:
+            print(f"No se pudo leer el log {log_content.path}: {e}")
+            return None
+
+    def _part_files(self):
+        """
+        Archivos part-* del formato actual, como rutas relativas a output_dir
+        """
+        for table in self.TABLES:
+            for root, _, names in os.walk(os.path.join(self.output_dir, table)):
+                for name in sorted(names):
+                    if name.startswith('part-') and name.endswith('.' + self.extension):
+                        yield os.path.relpath(os.path.join(root, name), self.output_dir)
+
+    def _read_table(self, path: str, columns: List[str] = None):
+        if self.fmt == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(path).read(columns=columns)
+        import pyarrow.ipc as ipc
+        with self.pa.OSFile(path, 'rb') as f:
+            table = ipc.open_file(f).read_all()
+        return table.select(columns) if columns else table
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """
+        Lee el índice de runs exportados
+        
+        Sin índice (export previo a él) o con uno ilegible se reconstruye
+        leyendo las columnas run_id/updated_at de los archivos existentes. Con
+        un índice válido se borran los archivos que no figuran en él: son de un
+        lote que se cortó antes de registrarse y sus runs se exportarán de nuevo.
+        """
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)['runs']
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Índice del export ilegible ({e}), se reconstruye desde {self.output_dir}/")
+            self.index = self._rebuild_index()
+            if self.index:
+                self._save_index()
+            return self.index
+        
+        indexed = {path for entry in index.values() for path in entry['files']}
+        for path in self._part_files():
+            if path not in indexed:
+                print(f"Borrando archivo no registrado de un export interrumpido: {path}")
+                os.remove(os.path.join(self.output_dir, path))
+        return index
+
+    def _rebuild_index(self) -> Dict[str, Dict]:
+        index = {}
+        for path in self._part_files():
+            full_path = os.path.join(self.output_dir, path)
+            is_runs = path.split(os.sep, 1)[0] == 'runs'
+            table = self._read_table(full_path, ['run_id', 'updated_at'] if is_runs else ['run_id'])
+            updated = table.column('updated_at').to_pylist() if is_runs else [None] * table.num_rows
+            for run_id, updated_at in zip(table.column('run_id').to_pylist(), updated):
+                entry = index.setdefault(str(run_id), {'updated_at': None, 'files': []})
+                if path not in entry['files']:
+                    entry['files'].append(path)
+                if updated_at is not None:
+                    entry['updated_at'] = updated_at.strftime('%Y-%m-%dT%H:%M:%SZ')
+        return index
+
+    def _save_index(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'format': self.fmt, 'runs': self.index}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+
+    def add_run(self, run: Dict):
+        """
+        Agrega un run al lote actual y escribe el lote si está lleno
+        
+        Las filas de las cuatro tablas se arman primero y se agregan al lote
+        solo cuando el run está completo, para no escribir nunca un run a medias.
+        Los runs sin terminar o ya exportados sin cambios se omiten.
+        """
+        if run.get('status') != 'completed':
+            self.skipped_runs += 1
+            return
+        run_id = str(run['id'])
+        if run_id in self.pending:
+            self.flush()
+        exported = self.index.get(run_id)
+        if exported and exported['updated_at'] == run.get('updated_at'):
+            return
+        if exported:
+            self.superseded.add(run_id)
+
+        partition = self._partition(run)
+        rows = {table: [] for table in self.TABLES}
+        for table, row, source in iter_run_rows(run):
+            for column in self.TIMESTAMP_COLUMNS:
+                if column in row:
+                    row[column] = parse_timestamp(row[column])
+            if table == 'steps' and self.include_logs:
+                row['log_content'] = self._step_log_text(source.get('log_content'))
+            rows[table].append(row)
+
+        for table, table_rows in rows.items():
+            if table_rows:
+                self.rows[table][partition].extend(table_rows)
+        self.pending[run_id] = {'updated_at': run.get('updated_at'), 'partition': partition,
+                                'tables': [table for table, table_rows in rows.items() if table_rows]}
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def _write_table(self, table, path: str):
+        if self.fmt == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, path, compression='zstd')
+        else:
+            import pyarrow.ipc as ipc
+            with ipc.new_file(path, table.schema,
+                              options=ipc.IpcWriteOptions(compression='zstd')) as writer:
+                writer.write_table(table)
+
+    def _drop_superseded(self):
+        """
+        Quita de los archivos ya escritos las filas de los runs que se van a
+        reescribir, reemplazando cada archivo afectado de forma atómica
+        """
+        import pyarrow.compute as pc
+        run_ids = self.pa.array([int(run_id) for run_id in self.superseded], self.pa.int64())
+        paths = {path for run_id in self.superseded for path in self.index[run_id]['files']}
+        for path in sorted(paths):
+            full_path = os.path.join(self.output_dir, path)
+            if not os.path.exists(full_path):
+                continue
+            table = self._read_table(full_path)
+            kept = table.filter(pc.invert(pc.is_in(table.column('run_id'), value_set=run_ids)))
+            if kept.num_rows == table.num_rows:
+                continue
+            if kept.num_rows:
+                self._write_table(kept, full_path + '.tmp')
+                os.replace(full_path + '.tmp', full_path)
+            else:
+                os.remove(full_path)
+        for run_id in self.superseded:
+            del self.index[run_id]
+        self.superseded.clear()
+
+    def flush(self):
+        """
+        Escribe el lote acumulado como un archivo nuevo por tabla y partición
+        y lo registra en el índice
+        """
+        if not self.pending:
+            return
+        if self.superseded:
+            self._drop_superseded()
+        written = {}
+        for table_name, partitions in self.rows.items():
+            for (repo, date), rows in partitions.items():
+                partition_dir = os.path.join(self.output_dir, table_name, f"repo={repo}", f"date={date}")
+                os.makedirs(partition_dir, exist_ok=True)
+                path = os.path.join(partition_dir,
+                                    f"part-{self.session}-{self.batch_number:05d}.{self.extension}")
+                table = self.pa.Table.from_pylist(rows, schema=self.schemas[table_name])
+                self._write_table(table, path)
+                written[table_name, (repo, date)] = os.path.relpath(path, self.output_dir)
+            partitions.clear()
+        for run_id, entry in self.pending.items():
+            self.index[run_id] = {
+                'updated_at': entry['updated_at'],
+                'files': [written[table, entry['partition']] for table in entry['tables']]
+            }
+        self._save_index()
+        print(f"Lote columnar {self.batch_number} escrito en {self.output_dir}/ ({len(self.pending)} runs)")
+        self.batch_number += 1
+        self.pending.clear()
+
+    def close(self):
+        """
+        Escribe lo que quede pendiente
+        """
+        self.flush()
+        if self.skipped_runs:
+            print(f"{self.skipped_runs} runs sin terminar no se exportaron; se exportarán "
+                  f"cuando terminen en una próxima extracción")
+
+    @classmethod
+    def export_directory(cls, runs_dir: str, output_dir: str, **kwargs) -> 'ColumnarRunSink':
+        """
+        Exporta un directorio de run_*.json ya extraídos
+        
+        Args:
+            runs_dir: Directorio con los run_*.json
+            output_dir: Directorio raíz del export
+            **kwargs: Opciones del sink (fmt, batch_size, include_logs)
+        """
+        sink = cls(output_dir, **kwargs)
+        for file_name in sorted(os.listdir(runs_dir)):
+            if not (file_name.startswith('run_') and file_name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(runs_dir, file_name), 'r', encoding='utf-8') as f:
+                    sink.add_run(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Error al leer {file_name}: {e}")
+        sink.close()
+        return sink
+
+
 class GitHubRunsExtractor:
     def __init__(self, token: Optional[str] = None):
         """
@@ -218,43 +1066,39 @@ class GitHubRunsExtractor:
             return "Run Unknown Step"
 
     
-    def parse_log_by_steps(self, log_content: str, job_steps: List[Dict], job_name: str) -> List[Dict]:
+    def parse_log_by_steps(self, log_index: LogIndex, job_steps: List[Dict], job_name: str) -> List[Dict]:
         """
         Parsea el log dividiéndolo por steps
         
         Args:
-            log_content: Contenido completo del log
+            log_index: Índice de líneas del log del job
             job_steps: Lista de steps del job desde el YAML
             job_name: Nombre del job
             
         Returns:
-            Lista de steps con sus respectivos logs
+            Lista de steps con sus respectivos logs (como LogSlice)
         """
         parsed_steps = []
-        # log_lines = log_content.split('\n')
-        cleaned = re.sub(r'\x1b\[[0-9;]*[mK]', '', log_content)
-        # elimina marcadores ##[group], ##[section]…
-        cleaned = re.sub(r'##\[[^\]]+\]', '', cleaned)
-        log_lines = cleaned.split('\n')
-        print(f"[DEBUG parse] {len(log_lines)} líneas a parsear para job «{job_name}»")
+        line_count = len(log_index)
+        print(f"[DEBUG parse] {line_count} líneas a parsear para job «{job_name}»")
         print(f"[DEBUG parse] Steps a buscar: {len(job_steps)}")
         
         # Identificar el setup job
-        setup_log = []
         setup_end_pattern = f"Complete job name: {job_name}"
         setup_end_idx = 0
+        setup_stop = line_count
         
-        for i, line in enumerate(log_lines):
+        for i, line in log_index.iter_lines():
             if setup_end_pattern in line:
                 setup_end_idx = i
+                setup_stop = i
                 break
-            setup_log.append(line)
         
         # Agregar setup step
         setup_step = {
             'name': 'Set up job',
             'type': 'setup',
-            'log_content': '\n'.join(setup_log),
+            'log_content': log_index.slice(0, setup_stop),
             'start_line': 0,
             'end_line': setup_end_idx
         }
@@ -268,6 +1112,8 @@ class GitHubRunsExtractor:
             step_patterns.append({
                 'step': step,
                 'pattern': identifier,
+                # \b para word boundaries, IGNORECASE para casing flexible
+                'regex': re.compile(rf'\b{re.escape(identifier)}\b', re.IGNORECASE),
                 'found': False,
                 'start_idx': -1,
                 'end_idx': -1
@@ -276,17 +1122,17 @@ class GitHubRunsExtractor:
             print(f"[DEBUG parse] {p['pattern']!r} found={p['found']} start={p['start_idx']}")
         
         # Buscar cada step en el log
-        remaining_lines = log_lines[setup_end_idx + 1:]
-        
-        for i, line in enumerate(remaining_lines, start=setup_end_idx + 1):
-            for pattern_info in step_patterns:
-                if not pattern_info['found']:
-                    # \b para word boundaries, IGNORECASE para casing flexible
-                    pat = re.escape(pattern_info['pattern'])
-                    if re.search(rf'\b{pat}\b', line, re.IGNORECASE):
+        pending = len(step_patterns)
+        if pending:
+            for i, line in log_index.iter_lines(setup_end_idx + 1):
+                for pattern_info in step_patterns:
+                    if not pattern_info['found'] and pattern_info['regex'].search(line):
                         pattern_info['found'] = True
                         pattern_info['start_idx'] = i
+                        pending -= 1
                         break
+                if not pending:
+                    break
         
         # Determinar los rangos de cada step
         found_patterns = [p for p in step_patterns if p['found']]
@@ -299,13 +1145,12 @@ class GitHubRunsExtractor:
             if i + 1 < len(found_patterns):
                 end_idx = found_patterns[i + 1]['start_idx'] - 1
             else:
-                end_idx = len(log_lines) - 1
+                end_idx = line_count - 1
             
             pattern_info['end_idx'] = end_idx
             
-            # Extraer el log del step
-            step_log_lines = log_lines[start_idx:end_idx + 1]
-            step_log_content = '\n'.join(step_log_lines)
+            # Referenciar el log del step como rango de bytes
+            step_log_content = log_index.slice(start_idx, end_idx + 1)
             workflow_code = self.get_step_workflow_code(pattern_info['step'])
             
             step_data = {
@@ -347,7 +1192,7 @@ class GitHubRunsExtractor:
     
     def get_run_jobs(self, owner: str, repo: str, run_id: int) -> List[Dict]:
         """
-        Obtiene los jobs de un run específico
+        Obtiene los jobs de un run específico, de todos sus attempts
         
         Args:
             owner: Propietario del repositorio
@@ -355,21 +1200,33 @@ class GitHubRunsExtractor:
             run_id: ID del run
             
         Returns:
-            Lista de jobs
+            Lista de jobs (cada uno con su run_attempt)
         """
         url = f"https://api.github.com/repos/{owner}/{repo}/actions/runs/{run_id}/jobs"
+        # filter=all incluye los jobs de attempts anteriores (por defecto solo el último)
+        params = {'filter': 'all', 'per_page': 100, 'page': 1}
+        jobs = []
         
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json().get('jobs', [])
+            while True:
+                response = requests.get(url, headers=self.headers, params=params)
+                response.raise_for_status()
+                data = response.json()
+                page_jobs = data.get('jobs', [])
+                jobs.extend(page_jobs)
+                if not page_jobs or len(jobs) >= data.get('total_count', 0):
+                    return jobs
+                params['page'] += 1
         except requests.exceptions.RequestException as e:
             print(f"Error al obtener jobs del run {run_id}: {e}")
-            return []
+            return jobs
     
     def get_run_logs(self, owner: str, repo: str, run_id: int) -> Dict[str, str]:
         """
-        Obtiene los logs de un run específico y los descomprime
+        Obtiene los logs de un run específico y los extrae a disco
+        
+        El ZIP se descarga en streaming a un archivo temporal y cada log se
+        copia tal cual al directorio 'logs', sin cargarlo completo en memoria.
         
         Args:
             owner: Propietario del repositorio
@@ -377,19 +1234,21 @@ class GitHubRunsExtractor:
             run_id: ID del run
             
         Returns:
-            Dict con job_name -> log_content
+            Dict con job_name -> ruta del archivo de log
         """
         url = f"https://api.github.com/repos/{owner}/{repo}/actions/runs/{run_id}/logs"
         logs_dict = defaultdict(str)
         os.makedirs('logs', exist_ok=True)
+        temp_zip_path = None
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = requests.get(url, headers=self.headers, stream=True)
             response.raise_for_status()
             
             # Crear archivo temporal para el ZIP
             with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_zip:
-                temp_zip.write(response.content)
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    temp_zip.write(chunk)
                 temp_zip_path = temp_zip.name
             
             # Extraer logs del ZIP
@@ -398,30 +1257,25 @@ class GitHubRunsExtractor:
                     if file_name.endswith('.txt'):
                         if '/' in file_name:  # <<<<< Cambio clave aquí
                             continue
-                        with zip_file.open(file_name) as log_file:
-                            log_content = log_file.read().decode('utf-8', errors='ignore')
-                            
-                            # Extraer nombre del job del nombre del archivo
-                            job_name = self._extract_job_name_from_filename(file_name)
-                            #print(f"Procesando log para job: {job_name}")
-                            safe_name = f"{run_id}_" + \
-                                job_name.replace(' ', '_').replace('/', '_') + '.txt'
-                            out_path = os.path.join('logs', safe_name)
-
-                            # Guardar en disco
-                            with open(out_path, 'w', encoding='utf-8') as f:
-                                f.write(log_content)
-                            logs_dict[job_name] = log_content
-                            # print(logs_dict[job_name][:50] + '...')  # Mostrar solo los primeros 100 caracteres
-                            
-            
-            # Limpiar archivo temporal
-            os.unlink(temp_zip_path)
+                        # Extraer nombre del job del nombre del archivo
+                        job_name = self._extract_job_name_from_filename(file_name)
+                        safe_name = f"{run_id}_" + \
+                            job_name.replace(' ', '_').replace('/', '_') + '.txt'
+                        out_path = os.path.join('logs', safe_name)
+
+                        # Guardar en disco
+                        with zip_file.open(file_name) as log_file, open(out_path, 'wb') as f:
+                            shutil.copyfileobj(log_file, f)
+                        logs_dict[job_name] = out_path
             
         except requests.exceptions.RequestException as e:
             print(f"Error al obtener logs del run {run_id}: {e}")
         except Exception as e:
             print(f"Error al procesar logs del run {run_id}: {e}")
+        finally:
+            # Limpiar archivo temporal
+            if temp_zip_path and os.path.exists(temp_zip_path):
+                os.unlink(temp_zip_path)
         
         return logs_dict
     
@@ -446,21 +1300,24 @@ class GitHubRunsExtractor:
         return name_without_ext
     
     def _match_job_with_log(self, job: Dict, logs_dict: Dict[str, str]) -> str:
+        """
+        Busca la ruta del log que corresponde al job (cadena vacía si no hay)
+        """
         job_name = job.get('name', '')
         # Normalizar nombres para comparación
         normalizer = lambda s: re.sub(r'\W+', '_', s).lower()
         job_name_norm = normalizer(job_name)
         
         # 1. Buscar coincidencia exacta normalizada
-        for log_name, log_content in logs_dict.items():
+        for log_name, log_path in logs_dict.items():
             if job_name_norm == normalizer(log_name):
-                return log_content
+                return log_path
         
         # 2. Buscar coincidencia parcial
-        for log_name, log_content in logs_dict.items():
+        for log_name, log_path in logs_dict.items():
             log_name_norm = normalizer(log_name)
             if job_name_norm in log_name_norm or log_name_norm in job_name_norm:
-                return log_content
+                return log_path
         
         return ""
     
@@ -473,7 +1330,7 @@ class GitHubRunsExtractor:
             run_data: Datos del run
             workflow_data: Datos del workflow
             jobs_data: Datos de los jobs
-            logs_dict: Diccionario con logs por job
+            logs_dict: Diccionario con la ruta del log por job
             workflow_yaml: Contenido YAML del workflow parseado
             
         Returns:
@@ -502,11 +1359,13 @@ class GitHubRunsExtractor:
                 }
                 
                 # Agregar logs parseados por steps si están disponibles
-                if logs_dict and workflow_yaml:
-                    log_content = self._match_job_with_log(job, logs_dict)
-                    if log_content:
+                # (el ZIP de logs solo trae los jobs del último attempt)
+                is_latest_attempt = job.get('run_attempt') in (None, run_data.get('run_attempt'))
+                if logs_dict and workflow_yaml and is_latest_attempt:
+                    log_path = self._match_job_with_log(job, logs_dict)
+                    if log_path:
                         job_steps = self.get_job_steps_from_yaml(workflow_yaml, job.get('name', ''))
-                        parsed_steps = self.parse_log_by_steps(log_content, job_steps, job.get('name', ''))
+                        parsed_steps = self.parse_log_by_steps(LogIndex(log_path), job_steps, job.get('name', ''))
                         for step in processed_job['steps']:
                             step['workflow_code'] = next(
                                 (ps.get('workflow_code') for ps in parsed_steps if ps.get('name') == step['name']), 
@@ -554,7 +1413,8 @@ class GitHubRunsExtractor:
     
     def extract_runs(self, owner: str, repo: str, max_runs: int = None, 
                     include_jobs: bool = True, include_workflow_details: bool = True,
-                    include_logs: bool = True, parse_steps: bool = True) -> List[Dict]:
+                    include_logs: bool = True, parse_steps: bool = True,
+                    sinks: List = None) -> List[Dict]:
         """
         Extrae todos los runs de un repositorio
         
@@ -566,6 +1426,8 @@ class GitHubRunsExtractor:
             include_workflow_details: Si incluir detalles del workflow
             include_logs: Si incluir logs de los jobs
             parse_steps: Si parsear logs por steps (requiere include_logs=True)
+            sinks: Destinos (ej: ColumnarRunSink) que reciben cada run con
+                   add_run() apenas se procesa
             
         Returns:
             Lista de runs procesados
@@ -624,13 +1486,15 @@ class GitHubRunsExtractor:
                 if include_logs and include_jobs:
                     print(f"  Descargando logs...")
                     logs_dict = self.get_run_logs(owner, repo, run['id'])
-                    for job_name, log_content in logs_dict.items():
-                        print(f"    Log para job '{job_name}': {len(log_content)} caracteres")
+                    for job_name, log_path in logs_dict.items():
+                        print(f"    Log para job '{job_name}': {os.path.getsize(log_path)} bytes")
                     print(f"  Logs obtenidos: {len(logs_dict)} archivos")
                 
                 # Procesar y agregar el run
                 processed_run = self.process_run_data(run, workflow_data, jobs_data, logs_dict, workflow_yaml)
                 all_runs.append(processed_run)
+                for sink in sinks or []:
+                    sink.add_run(processed_run)
             
             if max_runs and len(all_runs) >= max_runs:
                 break
@@ -654,14 +1518,15 @@ class GitHubRunsExtractor:
         
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(runs, f, indent=2, ensure_ascii=False)
+                json.dump(runs, f, indent=2, ensure_ascii=False, cls=RunsJSONEncoder)
             print(f"Runs guardados en: {filename}")
         except Exception as e:
             print(f"Error al guardar archivo: {e}")
     
     def save_runs_individually(self, runs: List[Dict]):
         """
-        Guarda cada run en un archivo JSON individual
+        Guarda cada run en un archivo JSON individual y actualiza el
+        manifest del directorio con los runs guardados
         
         Args:
             runs: Lista de runs
@@ -675,11 +1540,25 @@ class GitHubRunsExtractor:
             else:
                 output_dir = os.path.join("unknown_repo")
             os.makedirs(output_dir, exist_ok=True)
+            manifest = RunManifest(output_dir)
             
-            for run in runs:
-                filename = f"{output_dir}/run_{run['id']}.json"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(run, f, indent=2, ensure_ascii=False)
+            try:
+                for run in runs:
+                    manifest.relocate_logs(run)
+                    filename = f"{output_dir}/run_{run['id']}.json"
+                    # Archivo temporal + rename: nunca queda un run_*.json a medias
+                    try:
+                        with open(filename + '.tmp', 'w', encoding='utf-8') as f:
+                            json.dump(run, f, indent=2, ensure_ascii=False, cls=RunsJSONEncoder)
+                    except Exception:
+                        os.remove(filename + '.tmp')
+                        raise
+                    os.replace(filename + '.tmp', filename)
+                    manifest.add_run(run)
+            finally:
+                # Registrar en el manifest los runs ya guardados aunque alguno falle
+                manifest.save()
+                print(f"Manifest actualizado: {manifest.path} ({len(manifest.runs)} runs)")
             
             print(f"Runs guardados individualmente en: {output_dir}/")
         except Exception as e:
@@ -687,8 +1566,8 @@ class GitHubRunsExtractor:
 
 def main():
     parser = argparse.ArgumentParser(description='Extrae workflow runs de un repositorio de GitHub')
-    parser.add_argument('owner', help='Propietario del repositorio')
-    parser.add_argument('repo', help='Nombre del repositorio')
+    parser.add_argument('owner', nargs='?', help='Propietario del repositorio')
+    parser.add_argument('repo', nargs='?', help='Nombre del repositorio')
     parser.add_argument('--token', help='Token de GitHub (recomendado)', 
                        default=os.getenv('GITHUB_TOKEN'))
     parser.add_argument('--max-runs', type=int, help='Número máximo de runs a extraer')
@@ -703,22 +1582,59 @@ def main():
                        help='No incluir detalles del workflow')
     parser.add_argument('--no-step-parsing', action='store_true',
                        help='No parsear logs por steps (usar parsing original por jobs)')
+    parser.add_argument('--rebuild-manifest', metavar='DIR',
+                       help='Regenerar el manifest de un directorio de runs ya extraídos y salir')
+    parser.add_argument('--columnar', metavar='DIR',
+                       help='Exportar además runs/attempts/jobs/steps como tablas columnares en DIR')
+    parser.add_argument('--columnar-format', choices=['parquet', 'arrow'], default='parquet',
+                       help='Formato del export columnar (por defecto parquet)')
+    parser.add_argument('--columnar-batch', type=int, default=100,
+                       help='Runs por lote del export columnar')
+    parser.add_argument('--columnar-logs', action='store_true',
+                       help='Incluir el texto de los logs en la tabla de steps')
+    parser.add_argument('--columnar-from', metavar='RUNS_DIR',
+                       help='Exportar a --columnar un directorio de runs ya extraídos y salir')
     
     args = parser.parse_args()
     
+    if args.rebuild_manifest:
+        manifest = RunManifest.rebuild(args.rebuild_manifest)
+        print(f"Manifest regenerado: {manifest.path} ({len(manifest.runs)} runs)")
+        return
+    
+    columnar_options = {
+        'fmt': args.columnar_format,
+        'batch_size': args.columnar_batch,
+        'include_logs': args.columnar_logs
+    }
+    if args.columnar_from:
+        if not args.columnar:
+            parser.error('--columnar-from requiere --columnar DIR')
+        ColumnarRunSink.export_directory(args.columnar_from, args.columnar, **columnar_options)
+        return
+    if not args.owner or not args.repo:
+        parser.error('owner y repo son obligatorios')
+    
     # Crear extractor
     extractor = GitHubRunsExtractor(token=args.token)
+    sinks = [ColumnarRunSink(args.columnar, **columnar_options)] if args.columnar else []
     
     # Extraer runs
-    runs = extractor.extract_runs(
-        owner=args.owner,
-        repo=args.repo,
-        max_runs=args.max_runs,
-        include_jobs=not args.no_jobs,
-        include_workflow_details=not args.no_workflow,
-        include_logs=not args.no_logs and not args.no_jobs,
-        parse_steps=not args.no_step_parsing and not args.no_logs and not args.no_jobs
-    )
+    try:
+        runs = extractor.extract_runs(
+            owner=args.owner,
+            repo=args.repo,
+            max_runs=args.max_runs,
+            include_jobs=not args.no_jobs,
+            include_workflow_details=not args.no_workflow,
+            include_logs=not args.no_logs and not args.no_jobs,
+            parse_steps=not args.no_step_parsing and not args.no_logs and not args.no_jobs,
+            sinks=sinks
+        )
+    finally:
+        # Escribir los lotes pendientes aunque la extracción se interrumpa
+        for sink in sinks:
+            sink.close()
     
     if not runs:
         print("No se encontraron runs")